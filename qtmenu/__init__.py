@@ -1,10 +1,14 @@
 import re
+import threading
+import time
+from collections import deque
 from enum import Enum
 from functools import partial
-from typing import List, Optional
+from typing import List, Optional, Deque, Tuple
 
 from qthandy import vbox, transparent, clear_layout, margins, hbox, grid, line, sp, vspacer
-from qtpy.QtCore import Qt, Signal, QPropertyAnimation, QEasingCurve, QPoint, QObject, QEvent, QTimer, QMargins, QSize
+from qtpy.QtCore import Qt, Signal, QPropertyAnimation, QEasingCurve, QPoint, QObject, QEvent, QTimer, QMargins, QSize, \
+    QRunnable, QThreadPool
 from qtpy.QtGui import QAction, QMouseEvent, QCursor, QShowEvent, QHideEvent, QIcon, QKeyEvent
 from qtpy.QtWidgets import QApplication, QAbstractButton, QToolButton, QLabel, QFrame, QWidget, QPushButton, QMenu, \
     QScrollArea, QLineEdit, QCheckBox, QTabWidget
@@ -51,6 +55,39 @@ class MouseEventDelegate(QObject):
         return super(MouseEventDelegate, self).eventFilter(watched, event)
 
 
+class SearchSignals(QObject):
+    finished = Signal(int, object)
+    done = Signal()
+
+
+class SearchTask(QRunnable):
+    def __init__(self, searchId: int, text: str, candidates: List[str], cancelled: threading.Event):
+        super().__init__()
+        # owned by the application on the GUI thread so that neither the menu nor the pool thread can
+        # destroy it while the task emits; it deletes itself there once the task is done
+        self.signals = SearchSignals(QApplication.instance())
+        self.signals.done.connect(self.signals.deleteLater)
+        self._searchId = searchId
+        self._text = text
+        self._candidates = candidates
+        self._cancelled = cancelled
+
+    def run(self):
+        try:
+            pattern = re.compile(self._text, re.IGNORECASE)
+        except re.error:
+            pattern = re.compile(re.escape(self._text), re.IGNORECASE)
+        try:
+            matches = []
+            for i, candidate in enumerate(self._candidates):
+                if i % 256 == 0 and self._cancelled.is_set():
+                    return
+                matches.append(pattern.search(candidate) is not None)
+            self.signals.finished.emit(self._searchId, matches)
+        finally:
+            self.signals.done.emit()
+
+
 class ActionTooltipDisplayMode(Enum):
     NONE = 0
     ON_HOVER = 1
@@ -242,6 +279,19 @@ class MenuWidget(QWidget):
         self._parentMenu: Optional[MenuWidget] = None
         self._tooltipDisplayMode = ActionTooltipDisplayMode.ON_HOVER
         self._search: Optional[QLineEdit] = None
+        self._searchId: int = 0
+        self._searchItems: List[MenuItemWidget] = []
+        self._searchCancelled: Optional[threading.Event] = None
+        self._pendingVisibility: Deque[Tuple[MenuItemWidget, bool]] = deque()
+        self._searchBatchBudget: float = 0.008
+        self._searchTimer = QTimer(self)
+        self._searchTimer.setSingleShot(True)
+        self._searchTimer.setInterval(100)
+        self._searchTimer.timeout.connect(self._applySearch)
+        self._visibilityTimer = QTimer(self)
+        self._visibilityTimer.setSingleShot(True)
+        self._visibilityTimer.setInterval(0)
+        self._visibilityTimer.timeout.connect(self._applyVisibilityBatch)
         self._keyNavigationEnabled: bool = False
         self._endSpacer: Optional[QWidget] = None
         vbox(self, 0, 0)
@@ -253,7 +303,7 @@ class MenuWidget(QWidget):
 
         if isinstance(parent, QAbstractButton):
             MenuDelegate(parent, self)
-            parent.clicked.connect(lambda: self.exec())
+            parent.clicked.connect(self._execFromParent)
         elif isinstance(parent, MenuWidget):
             self.setParentMenu(parent)
 
@@ -281,7 +331,7 @@ class MenuWidget(QWidget):
     def setTitle(self, title: str):
         self._title = title
 
-    def setParentMenu(self, parentMenu: 'MenuWidget'):
+    def setParentMenu(self, parentMenu: Optional['MenuWidget']):
         self._parentMenu = parentMenu
         margins(self, left=0, right=0)
 
@@ -298,7 +348,7 @@ class MenuWidget(QWidget):
             self._search = QLineEdit()
             self._search.setPlaceholderText('Search...')
             self._search.setClearButtonEnabled(True)
-            self._search.textChanged.connect(self._applySearch)
+            self._search.textChanged.connect(self._searchTextChanged)
             self.layout().insertWidget(0, wrap(self._search, margin_left=5, margin_right=5),
                                        alignment=Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop)
 
@@ -306,11 +356,20 @@ class MenuWidget(QWidget):
             self._endSpacer.setMinimumHeight(1)
             self.layout().addWidget(self._endSpacer)
         elif self._search:
-            self.layout().removeWidget(self._search)
+            self._cancelSearch()
+            for item in self._menuItems:
+                item.setVisible(item.action().isVisible())
+            wrapper = self._search.parent()
+            self.layout().removeWidget(wrapper)
+            wrapper.deleteLater()
             self._search = None
             self.layout().removeWidget(self._endSpacer)
+            self._endSpacer.deleteLater()
             self._endSpacer = None
 
+    def setSearchDelay(self, msec: int):
+        self._searchTimer.setInterval(msec)
+
     def setKeyNavigationEnabled(self, enabled):
         self._keyNavigationEnabled = enabled
         if enabled:
@@ -320,8 +379,7 @@ class MenuWidget(QWidget):
             self._setFocus(self._currentFocus, False)
 
     def clear(self):
-        self._menuItems.clear()
-        self._subMenus.clear()
+        self._releaseItems()
         clear_layout(self._frame)
 
     def isEmpty(self) -> bool:
@@ -390,6 +448,9 @@ class MenuWidget(QWidget):
 
         self.show()
 
+    def _execFromParent(self):
+        self.exec()
+
     def _showSubmenu(self, submenu: SubmenuWidget):
         margins: QMargins = self.layout().contentsMargins()
         pos = submenu.mapToGlobal(QPoint(submenu.width() + margins.left() + margins.right(), 0))
@@ -404,16 +465,64 @@ class MenuWidget(QWidget):
         self._menuItems.append(wdg)
         return wdg
 
-    def _applySearch(self, text: str):
-        if not text:
-            for item in self._menuItems:
-                item.setVisible(True)
-
+    def _releaseItems(self):
         for item in self._menuItems:
-            if re.search(text, item.action().text(), re.IGNORECASE):
-                item.setVisible(True)
-            else:
-                item.setHidden(True)
+            try:
+                item.action().changed.disconnect(item.refresh)
+            except (RuntimeError, TypeError):
+                pass  # the action was already destroyed and Qt dropped the connection
+        for submenu in self._subMenus:
+            submenu.menu().setParentMenu(None)
+        self._menuItems.clear()
+        self._subMenus.clear()
+        self._currentFocus = 0
+        self._cancelSearch()
+
+    def _searchTextChanged(self, _: str):
+        self._searchTimer.start()
+
+    def _applySearch(self):
+        self._cancelSearch()
+        self._searchItems = list(self._menuItems)
+        text = self._search.text() if self._search else ''
+        if not text:
+            self._searchFinished(self._searchId, [True] * len(self._searchItems))
+            return
+
+        candidates = [x.action().text() for x in self._searchItems]
+        self._searchCancelled = threading.Event()
+        task = SearchTask(self._searchId, text, candidates, self._searchCancelled)
+        task.signals.finished.connect(self._searchFinished)
+        QThreadPool.globalInstance().start(task)
+
+    def _searchFinished(self, searchId: int, matches: List[bool]):
+        if searchId != self._searchId:
+            return
+        self._pendingVisibility = deque(zip(self._searchItems, matches))
+        self._searchItems = []
+        self._applyVisibilityBatch()
+
+    def _applyVisibilityBatch(self):
+        deadline = time.perf_counter() + self._searchBatchBudget
+        while self._pendingVisibility:
+            item, visible = self._pendingVisibility.popleft()
+            if item.isHidden() == visible:
+                item.setVisible(visible)
+            if time.perf_counter() >= deadline:
+                break
+
+        if self._pendingVisibility:
+            self._visibilityTimer.start()
+
+    def _cancelSearch(self):
+        self._searchId += 1
+        if self._searchCancelled is not None:
+            self._searchCancelled.set()
+            self._searchCancelled = None
+        self._searchItems = []
+        self._pendingVisibility.clear()
+        self._searchTimer.stop()
+        self._visibilityTimer.stop()
 
     def _changeFocus(self, direction: int):
         new_focus = self._currentFocus + direction
@@ -485,6 +594,16 @@ class TabularGridMenuWidget(MenuWidget):
 
         return tab
 
+    def clear(self):
+        self._releaseItems()
+        while self._frame.count():
+            tab = self._frame.widget(0)
+            self._frame.removeTab(0)
+            tab.deleteLater()
+
+    def isEmpty(self) -> bool:
+        return self._frame.count() == 0
+
     def addWidget(self, tabWidget: QWidget, wdg: QWidget, row: int, column: int, rowSpan: int = 1, colSpan: int = 1):
         tabWidget.layout().addWidget(wdg, row, column, rowSpan, colSpan)
 
@@ -509,6 +628,7 @@ class MenuDelegate(QMenu):
         self._menu = menu
         self._menu.aboutToShow.connect(self.aboutToShow.emit)
         self._menu.aboutToHide.connect(self.aboutToHide.emit)
+        self._menu.destroyed.connect(self.deleteLater)
 
         if isinstance(parent, (QPushButton, QToolButton)):
             parent.setMenu(self)
@@ -1,7 +1,12 @@
+import threading
+
+import pytest
+from qtpy.QtCore import QThreadPool
 from qtpy.QtGui import QAction
-from qtpy.QtWidgets import QPushButton
+from qtpy.QtWidgets import QPushButton, QWidget, QLineEdit
 
-from qtmenu import MenuWidget
+import qtmenu
+from qtmenu import MenuWidget, MenuItemWidget
 
 
 def test_init(qtbot):
@@ -32,3 +37,228 @@ def test_clear(qtbot):
     menu.clear()
     assert not menu.actions()
     assert menu.isEmpty()
+
+
+def search_field(menu: MenuWidget) -> QLineEdit:
+    return menu.findChild(QLineEdit)
+
+
+def item(menu: MenuWidget, text: str) -> MenuItemWidget:
+    return next(x for x in menu.findChildren(MenuItemWidget) if x.action().text() == text)
+
+
+@pytest.fixture
+def blocking_search(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    class BlockingSearchTask(qtmenu.SearchTask):
+        def __init__(self, *args):
+            super().__init__(*args)
+            self.signals.finished.connect(lambda *_: results.append(self))
+
+        def run(self):
+            started.set()
+            release.wait(5)
+            super().run()
+
+    monkeypatch.setattr(qtmenu, 'SearchTask', BlockingSearchTask)
+    yield started, release, results
+    release.set()
+    QThreadPool.globalInstance().waitForDone()
+
+
+def test_search(qtbot):
+    menu = MenuWidget()
+    qtbot.addWidget(menu)
+    menu.setSearchEnabled(True)
+    menu.addAction(QAction('Apple'))
+    menu.addAction(QAction('Banana'))
+
+    qtbot.keyClicks(search_field(menu), 'app')
+    qtbot.waitUntil(lambda: item(menu, 'Banana').isHidden())
+    assert not item(menu, 'Apple').isHidden()
+
+    search_field(menu).clear()
+    qtbot.waitUntil(lambda: not item(menu, 'Banana').isHidden())
+    assert not item(menu, 'Apple').isHidden()
+
+    qtbot.keyClicks(search_field(menu), '(')
+    qtbot.waitUntil(lambda: item(menu, 'Apple').isHidden() and item(menu, 'Banana').isHidden())
+
+
+def test_search_large_menu(qtbot):
+    menu = MenuWidget()
+    qtbot.addWidget(menu)
+    menu.setSearchEnabled(True)
+    actions = [QAction(f'Action {i}') for i in range(500)]
+    for action in actions:
+        menu.addAction(action)
+
+    qtbot.keyClicks(search_field(menu), 'Action 42')
+    qtbot.waitUntil(lambda: sum(not x.isHidden() for x in menu.findChildren(MenuItemWidget)) == 1)
+    assert not item(menu, 'Action 42').isHidden()
+
+
+def test_search_debounced(qtbot, monkeypatch):
+    dispatched = []
+
+    class RecordingSearchTask(qtmenu.SearchTask):
+        def __init__(self, searchId: int, text: str, candidates, cancelled):
+            super().__init__(searchId, text, candidates, cancelled)
+            dispatched.append(text)
+
+    monkeypatch.setattr(qtmenu, 'SearchTask', RecordingSearchTask)
+    menu = MenuWidget()
+    qtbot.addWidget(menu)
+    menu.setSearchEnabled(True)
+    menu.addAction(QAction('Apple'))
+    menu.addAction(QAction('Banana'))
+
+    qtbot.keyClicks(search_field(menu), 'Banana')
+    qtbot.waitUntil(lambda: item(menu, 'Apple').isHidden())
+    assert dispatched == ['Banana']
+
+
+def test_search_dropped_on_clear(qtbot):
+    menu = MenuWidget()
+    qtbot.addWidget(menu)
+    menu.setSearchEnabled(True)
+    menu.addAction(QAction('Apple'))
+
+    qtbot.keyClicks(search_field(menu), 'Banana')
+    menu.clear()
+    orange = QAction('Orange')
+    menu.addAction(orange)
+    qtbot.wait(300)
+
+    assert not item(menu, 'Orange').isHidden()
+
+
+def test_search_dropped_on_disable(qtbot):
+    menu = MenuWidget()
+    qtbot.addWidget(menu)
+    menu.setSearchEnabled(True)
+    apple = QAction('Apple')
+    menu.addAction(apple)
+
+    qtbot.keyClicks(search_field(menu), 'Banana')
+    menu.setSearchEnabled(False)
+    qtbot.wait(300)
+
+    assert not item(menu, 'Apple').isHidden()
+
+
+def test_search_disabled_restores_items(qtbot):
+    menu = MenuWidget()
+    qtbot.addWidget(menu)
+    menu.setSearchEnabled(True)
+    menu.addAction(QAction('Apple'))
+    menu.addAction(QAction('Banana'))
+
+    qtbot.keyClicks(search_field(menu), 'app')
+    qtbot.waitUntil(lambda: item(menu, 'Banana').isHidden())
+    search_field(menu).clear()
+    menu.setSearchEnabled(False)
+
+    assert not item(menu, 'Apple').isHidden()
+    assert not item(menu, 'Banana').isHidden()
+
+
+def test_search_in_flight_dropped_on_clear(qtbot, blocking_search):
+    started, release, results = blocking_search
+    menu = MenuWidget()
+    qtbot.addWidget(menu)
+    menu.setSearchEnabled(True)
+    apple = QAction('Apple')
+    banana = QAction('Banana')
+    menu.addAction(apple)
+    menu.addAction(banana)
+
+    qtbot.keyClicks(search_field(menu), 'app')
+    qtbot.waitUntil(started.is_set)
+    menu.clear()
+    menu.addAction(apple)
+    menu.addAction(banana)
+
+    with qtbot.captureExceptions() as exceptions:
+        release.set()
+        QThreadPool.globalInstance().waitForDone()
+        qtbot.wait(50)
+
+    assert not exceptions
+    assert not results
+    assert not item(menu, 'Banana').isHidden()
+
+
+def test_search_in_flight_dropped_on_disable(qtbot, blocking_search):
+    started, release, results = blocking_search
+    menu = MenuWidget()
+    qtbot.addWidget(menu)
+    menu.setSearchEnabled(True)
+    menu.addAction(QAction('Apple'))
+    menu.addAction(QAction('Banana'))
+
+    qtbot.keyClicks(search_field(menu), 'app')
+    qtbot.waitUntil(started.is_set)
+    menu.setSearchEnabled(False)
+
+    release.set()
+    QThreadPool.globalInstance().waitForDone()
+    qtbot.wait(50)
+
+    assert not results
+    assert not item(menu, 'Banana').isHidden()
+
+
+def test_clear_keeps_submenu(qtbot):
+    menu = MenuWidget()
+    qtbot.addWidget(menu)
+    submenu = MenuWidget(menu)
+    submenu.setTitle('Submenu')
+    submenu.addAction(QAction('Action 1'))
+
+    for _ in range(3):
+        menu.addMenu(submenu)
+        menu.clear()
+        qtbot.wait(1)
+
+    assert submenu.parent() is menu
+    assert len(submenu.actions()) == 1
+
+
+def test_clear_after_action_destroyed(qtbot):
+    menu = MenuWidget()
+    qtbot.addWidget(menu)
+    owner = QWidget()
+    menu.addAction(QAction('Action 1', owner))
+    menu.addAction(QAction('Action 2'))
+
+    owner.deleteLater()
+    qtbot.wait(1)
+
+    menu.clear()
+    assert menu.isEmpty()
+
+
+def test_menu_deleted_during_search(qtbot, qtlog, blocking_search):
+    started, release, _ = blocking_search
+    menu = MenuWidget()
+    menu.setSearchEnabled(True)
+    actions = [QAction(f'Action {i}') for i in range(100)]
+    for action in actions:
+        menu.addAction(action)
+
+    qtbot.keyClicks(search_field(menu), 'Action 1')
+    qtbot.waitUntil(started.is_set)
+    menu.deleteLater()
+    qtbot.wait(10)
+
+    with qtbot.captureExceptions() as exceptions:
+        release.set()
+        QThreadPool.globalInstance().waitForDone()
+        qtbot.wait(50)
+
+    assert not exceptions
+    assert not qtlog.records
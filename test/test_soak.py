@@ -0,0 +1,205 @@
+import gc
+import os
+import tracemalloc
+from collections import Counter
+from typing import Optional
+
+import pytest
+from qtpy import PYSIDE2, PYSIDE6
+from qtpy.QtCore import QEvent, QObject, QThreadPool
+from qtpy.QtGui import QAction
+from qtpy.QtWidgets import QApplication, QPushButton, QWidget, QLineEdit
+
+from qtmenu import MenuWidget, ScrollableMenuWidget, GridMenuWidget, TabularGridMenuWidget, MenuItemWidget
+
+CYCLES = int(os.environ.get('QTMENU_SOAK_CYCLES', 0))
+WARMUP_CYCLES = 20
+MAX_BYTES_PER_CYCLE = 512
+TRACKED_TYPES = ('MenuItemWidget', 'SubmenuWidget', 'MenuSectionWidget', 'MouseEventDelegate', 'MenuDelegate',
+                 'SearchSignals', 'SearchTask', 'MenuWidget', 'ScrollableMenuWidget', 'GridMenuWidget',
+                 'TabularGridMenuWidget')
+
+soak_test = pytest.mark.skipif(not CYCLES, reason='set QTMENU_SOAK_CYCLES to run the soak tests')
+
+
+def flush():
+    QThreadPool.globalInstance().waitForDone()
+    for _ in range(3):
+        QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+        QApplication.processEvents()
+    gc.collect()
+
+
+def receivers(obj: QObject, signal, signature: str) -> int:
+    if PYSIDE2 or PYSIDE6:
+        return obj.receivers(f'2{signature}')
+    return obj.receivers(signal)
+
+
+def python_objects() -> Counter:
+    return Counter(type(x).__name__ for x in gc.get_objects() if type(x).__name__ in TRACKED_TYPES)
+
+
+class Snapshot:
+    def __init__(self, actions, root: QObject):
+        flush()
+        self.widgets = len(QApplication.allWidgets())
+        self.children = len(root.findChildren(QObject))
+        self.connections = [receivers(x, x.changed, 'changed()') for x in actions]
+        self.objects = python_objects()
+        self.memory = tracemalloc.get_traced_memory()[0]
+
+
+def assert_flat(before: Snapshot, after: Snapshot, cycles: int):
+    assert after.widgets == before.widgets
+    assert after.children == before.children
+    assert after.connections == before.connections
+    assert after.objects == before.objects
+    assert (after.memory - before.memory) / cycles < MAX_BYTES_PER_CYCLE
+
+
+def soak(cycle, actions, root: QObject, cycles: int = CYCLES):
+    for _ in range(WARMUP_CYCLES):
+        cycle()
+        QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    tracemalloc.start()
+    try:
+        before = Snapshot(actions, root)
+        for _ in range(cycles):
+            cycle()
+            QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+        after = Snapshot(actions, root)
+    finally:
+        tracemalloc.stop()
+
+    assert_flat(before, after, cycles)
+
+
+def populate(menu: MenuWidget, actions) -> Optional[MenuWidget]:
+    if isinstance(menu, TabularGridMenuWidget):
+        tab = menu.addTab('Tab')
+        menu.addSection(tab, 'Section', 0, 0)
+        for i, action in enumerate(actions):
+            menu.addAction(tab, action, i + 1, 0)
+        menu.addSeparator(tab, len(actions) + 1, 0)
+    elif isinstance(menu, GridMenuWidget):
+        menu.addSection('Section', 0, 0)
+        for i, action in enumerate(actions):
+            menu.addAction(action, i + 1, 0)
+        menu.addSeparator(len(actions) + 1, 0)
+    else:
+        menu.addSection('Section')
+        for action in actions:
+            menu.addAction(action)
+        menu.addSeparator()
+        submenu = MenuWidget(menu)
+        submenu.setTitle('Submenu')
+        submenu.addAction(actions[0])
+        menu.addMenu(submenu)
+        return submenu
+
+
+def item(menu: MenuWidget, action: QAction) -> MenuItemWidget:
+    return next(x for x in menu.findChildren(MenuItemWidget) if x.action() is action)
+
+
+def discard(submenu: Optional[MenuWidget]):
+    if submenu is not None:
+        submenu.clear()
+        submenu.deleteLater()
+
+
+@pytest.fixture
+def actions():
+    actions = [QAction(f'Action {i}') for i in range(10)]
+    actions[0].setCheckable(True)
+    yield actions
+    flush()
+
+
+@soak_test
+@pytest.mark.parametrize('menu_class', [MenuWidget, ScrollableMenuWidget, GridMenuWidget, TabularGridMenuWidget])
+def test_exec_clear_cycles(qtbot, actions, menu_class):
+    menu = menu_class()
+    qtbot.addWidget(menu)
+    menu.setSearchEnabled(True)
+    menu.setSearchDelay(0)
+    search = menu.findChild(QLineEdit)
+
+    def cycle():
+        submenu = populate(menu, actions)
+        menu.exec(animated=False)
+        search.setText('Action 1')
+        qtbot.waitUntil(lambda: item(menu, actions[2]).isHidden())
+        search.clear()
+        qtbot.waitUntil(lambda: not item(menu, actions[2]).isHidden())
+        menu.close()
+        menu.clear()
+        discard(submenu)
+
+    soak(cycle, actions, menu)
+    assert menu.isEmpty()
+
+
+@soak_test
+@pytest.mark.parametrize('menu_class', [MenuWidget, ScrollableMenuWidget, GridMenuWidget, TabularGridMenuWidget])
+def test_menu_outlived_by_actions(qtbot, actions, menu_class):
+    holder = QWidget()
+    qtbot.addWidget(holder)
+
+    def cycle():
+        menu = menu_class(holder)
+        populate(menu, actions)
+        menu.exec(animated=False)
+        menu.close()
+        menu.deleteLater()
+
+    soak(cycle, actions, holder)
+
+
+@soak_test
+def test_button_menu_cycles(qtbot, actions):
+    btn = QPushButton('Button')
+    qtbot.addWidget(btn)
+
+    def cycle():
+        menu = MenuWidget(btn)
+        populate(menu, actions)
+        btn.menu().showEvent(None)
+        menu.close()
+        menu.deleteLater()
+
+    soak(cycle, actions, btn)
+
+
+@soak_test
+def test_search_toggle_cycles(qtbot, actions):
+    menu = MenuWidget()
+    qtbot.addWidget(menu)
+    populate(menu, actions)
+
+    def cycle():
+        menu.setSearchEnabled(True)
+        menu.findChild(QLineEdit).setText('Action 2')
+        menu.setSearchEnabled(False)
+
+    soak(cycle, actions, menu)
+
+
+@pytest.mark.parametrize('leak', ['connection', 'widget'])
+def test_soak_detects_leaks(qtbot, leak):
+    btn = QPushButton('Button')
+    qtbot.addWidget(btn)
+    actions = [QAction('Action 1')]
+
+    def cycle():
+        menu = MenuWidget(btn)
+        populate(menu, actions)
+        if leak == 'connection':
+            btn.clicked.connect(lambda: menu.exec())
+        else:
+            QWidget(btn)
+        menu.deleteLater()
+
+    with pytest.raises(AssertionError):
+        soak(cycle, actions, btn, cycles=50)